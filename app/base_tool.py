@@ -25,6 +25,11 @@ class BaseMCPTool(ABC):
         """Return the request-scoped execution context if available."""
         return get_execution_context()
 
+    async def shutdown(self) -> None:
+        """Release resources held by this tool (clients, pools, ...).
+        Called once when the server shuts down. Override if needed.
+        """
+
     @abstractmethod
     async def list_tools(self) -> list[Tool]:
         """List the tools provided by this module."""
@@ -1,12 +1,21 @@
+import hashlib
+import json
 import os
-from typing import List, Dict, Optional
+import time
+from typing import List, Dict, Optional, Tuple
 import httpx
+from loguru import logger
 from openai import AsyncOpenAI
 from mcp.shared.exceptions import McpError
 from mcp.types import ErrorData, INTERNAL_ERROR
 
 from ..exceptions import ConfigurationError
 
+# 相同请求的响应缓存：key 为请求参数的 sha256，value 为 (过期时间, 响应文本)
+# 由环境变量 LLM_CACHE_TTL（秒）开启，默认 0 表示不缓存
+LLM_CACHE_MAX_ENTRIES = 1024
+_response_cache: Dict[str, Tuple[float, str]] = {}
+
 
 class LLMClient:
     """通用LLM客户端，支持OpenAI兼容的API"""
@@ -14,6 +23,7 @@ class LLMClient:
     def __init__(self):
         self._api_key: Optional[str] = None
         self._base_url: Optional[str] = None
+        self._cache_ttl = _parse_cache_ttl()
 
     async def _create_client(self, base_url: Optional[str] = None) -> AsyncOpenAI:
         """创建新的OpenAI客户端（每次请求创建新实例避免连接复用问题）"""
@@ -74,6 +84,23 @@ class LLMClient:
                     details={"required_var": "OPENAI_MODEL"},
                 )
 
+        cache_ttl = self._cache_ttl
+        cache_key = None
+        if cache_ttl > 0:
+            cache_key = _make_cache_key(
+                model,
+                base_url or os.getenv("OPENAI_BASE_URL"),
+                messages,
+                max_tokens,
+                temperature,
+                kwargs,
+            )
+            cached = _response_cache.get(cache_key)
+            if cached is not None:
+                if cached[0] > time.monotonic():
+                    return cached[1]
+                del _response_cache[cache_key]
+
         client = await self._create_client(base_url)
         try:
             response = await client.chat.completions.create(
@@ -83,7 +110,7 @@ class LLMClient:
                 temperature=temperature,
                 **kwargs,
             )
-            return response.choices[0].message.content.strip()
+            content = response.choices[0].message.content.strip()
         except Exception as e:
             raise McpError(
                 ErrorData(
@@ -92,3 +119,41 @@ class LLMClient:
             )
         finally:
             await client.close()
+
+        if cache_key is not None:
+            # 超出容量时淘汰最早写入的条目
+            if len(_response_cache) >= LLM_CACHE_MAX_ENTRIES:
+                _response_cache.pop(next(iter(_response_cache)))
+            _response_cache[cache_key] = (time.monotonic() + cache_ttl, content)
+        return content
+
+
+def _parse_cache_ttl() -> int:
+    """读取 LLM_CACHE_TTL（秒），未设置或非法时为 0（不缓存）"""
+    raw = os.getenv("LLM_CACHE_TTL", "0")
+    try:
+        ttl = int(raw)
+    except ValueError:
+        ttl = -1
+    if ttl < 0:
+        logger.warning(f"Invalid LLM_CACHE_TTL={raw!r}, response cache disabled")
+        return 0
+    return ttl
+
+
+def _make_cache_key(
+    model: str,
+    base_url: Optional[str],
+    messages: List[Dict[str, str]],
+    max_tokens: int,
+    temperature: float,
+    extra: Dict,
+) -> str:
+    """根据请求参数生成缓存键"""
+    payload = json.dumps(
+        [model, base_url, messages, max_tokens, temperature, extra],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
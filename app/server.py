@@ -6,6 +6,7 @@ import logging
 import os
 import subprocess
 import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 import uvicorn
@@ -62,6 +63,7 @@ class AutomataMCPServer:
             title="Automata MCP Server",
             description="A centralized MCP server using FastAPI with plugin architecture",
             version="1.0.0",
+            lifespan=self._lifespan,
         )
 
         self.access_token = os.getenv("AUTOMATA_ACCESS_TOKEN") or ""
@@ -265,6 +267,16 @@ class AutomataMCPServer:
             create_router(self.authenticate, lambda: len(self.tools), self.tools),
         )
 
+    @asynccontextmanager
+    async def _lifespan(self, _app: FastAPI):
+        """应用生命周期：关闭时释放各工具持有的资源"""
+        yield
+        for modname, tool_instance in self.tools.items():
+            try:
+                await tool_instance.shutdown()
+            except Exception as e:
+                handle_exception(e, {"operation": "tool_shutdown", "tool": modname})
+
     def _validate_security_config(self):
         """验证安全配置"""
         # 检查Access Token配置
@@ -1,10 +1,14 @@
 import asyncio
+import codecs
+import importlib.util
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Sequence
 from urllib.parse import urlparse, urlunparse
 
-import html2text
 import httpx
-from bs4 import BeautifulSoup
 from mcp.shared.exceptions import McpError
 from mcp.types import (
     INTERNAL_ERROR,
@@ -15,7 +19,6 @@ from mcp.types import (
     TextContent,
     Tool,
 )
-from protego import Protego
 from pydantic import AnyUrl, BaseModel, Field
 
 from app.base_tool import BaseMCPTool
@@ -23,6 +26,61 @@ from app.base_tool import BaseMCPTool
 DEFAULT_USER_AGENT_AUTONOMOUS = "ModelContextProtocol/1.0 (Autonomous; +https://github.com/modelcontextprotocol/servers)"
 DEFAULT_USER_AGENT_MANUAL = "ModelContextProtocol/1.0 (User-Specified; +https://github.com/modelcontextprotocol/servers)"
 
+# 单次抓取最多读取的响应体字节数，超出部分不再下载和解码
+MAX_RESPONSE_BYTES = 5 * 1024 * 1024
+
+# 判断响应是否为 HTML 时检查的头部字节数
+HTML_SNIFF_BYTES = 256
+
+# 模块级共享的 HTTP 客户端，复用连接池、DNS 和 TLS 会话
+_client: httpx.AsyncClient | None = None
+
+# HTML 内容提取进程池的工作进程数上限
+EXTRACT_POOL_MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+# HTML 内容提取使用的进程池，首次使用时创建
+_extract_pool: ProcessPoolExecutor | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        # HTTP/2 依赖 h2 包，未安装时退回 HTTP/1.1
+        _client = httpx.AsyncClient(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared HTTP client if it has been created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _get_extract_pool() -> ProcessPoolExecutor:
+    """Return the shared HTML extraction process pool, creating it on first use."""
+    global _extract_pool
+    if _extract_pool is None:
+        # 使用 spawn 启动工作进程，避免 fork 正在运行的事件循环、线程池和日志锁
+        _extract_pool = ProcessPoolExecutor(
+            max_workers=EXTRACT_POOL_MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _extract_pool
+
+
+def shutdown_extract_pool() -> None:
+    """Shut down the HTML extraction process pool if it has been created."""
+    global _extract_pool
+    if _extract_pool is not None:
+        _extract_pool.shutdown(wait=False, cancel_futures=True)
+        _extract_pool = None
+
 
 async def extract_content_from_html(html: str) -> str:
     """Extract and convert HTML content to Markdown format.
@@ -33,15 +91,37 @@ async def extract_content_from_html(html: str) -> str:
     Returns:
         Simplified markdown version of the content
     """
-    # Run CPU-intensive operation in thread pool to avoid blocking event loop
-    return await asyncio.to_thread(_extract_content_from_html_sync, html)
+    # Run CPU-intensive operation in a process pool: BeautifulSoup and html2text
+    # are pure Python, so threads would still serialize on the GIL
+    global _extract_pool
+    loop = asyncio.get_running_loop()
+    pool = _get_extract_pool()
+    try:
+        return await loop.run_in_executor(
+            pool,
+            _extract_content_from_html_sync,
+            html,
+        )
+    except BrokenProcessPool as e:
+        # 工作进程异常退出后进程池不可再用，关闭并丢弃以便下次重建
+        pool.shutdown(wait=False, cancel_futures=True)
+        if _extract_pool is pool:
+            _extract_pool = None
+        return f"<error>Failed to extract content from HTML: {e}</error>"
 
 
 def _extract_content_from_html_sync(html: str) -> str:
     """Synchronous version of HTML content extraction."""
     try:
-        # 使用 BeautifulSoup 解析 HTML
-        soup = BeautifulSoup(html, "html.parser")
+        # 解析依赖较重，延迟到首次提取时（在进程池工作进程中）再导入
+        import html2text
+        from bs4 import BeautifulSoup, FeatureNotFound
+
+        # 使用 BeautifulSoup 解析 HTML，优先使用 C 实现的 lxml 解析器
+        try:
+            soup = BeautifulSoup(html, "lxml")
+        except FeatureNotFound:
+            soup = BeautifulSoup(html, "html.parser")
 
         # 移除 script 和 style 标签
         for script in soup(["script", "style"]):
@@ -116,36 +196,35 @@ async def check_may_autonomously_fetch_url(url: str, user_agent: str) -> None:
 
     robot_txt_url = get_robots_txt_url(url)
 
-    async with httpx.AsyncClient(
-        limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
-    ) as client:
-        try:
-            response = await client.get(
-                robot_txt_url,
-                follow_redirects=True,
-                headers={"User-Agent": user_agent},
-            )
-        except httpx.HTTPError:
-            raise McpError(
-                ErrorData(
-                    code=INTERNAL_ERROR,
-                    message=f"Failed to fetch robots.txt {robot_txt_url} due to a connection issue",
-                ),
-            )
-        if response.status_code in (401, 403):
-            raise McpError(
-                ErrorData(
-                    code=INTERNAL_ERROR,
-                    message=f"When fetching robots.txt ({robot_txt_url}), received status {response.status_code} so assuming that autonomous fetching is not allowed, the user can try manually fetching by using the fetch prompt",
-                ),
-            )
-        if 400 <= response.status_code < 500:
-            return
-        robot_txt = response.text
-    processed_robot_txt = "\n".join(
-        line for line in robot_txt.splitlines() if not line.strip().startswith("#")
-    )
-    robot_parser = Protego.parse(processed_robot_txt)
+    client = _get_client()
+    try:
+        response = await client.get(
+            robot_txt_url,
+            follow_redirects=True,
+            headers={"User-Agent": user_agent},
+        )
+    except httpx.HTTPError:
+        raise McpError(
+            ErrorData(
+                code=INTERNAL_ERROR,
+                message=f"Failed to fetch robots.txt {robot_txt_url} due to a connection issue",
+            ),
+        )
+    if response.status_code in (401, 403):
+        raise McpError(
+            ErrorData(
+                code=INTERNAL_ERROR,
+                message=f"When fetching robots.txt ({robot_txt_url}), received status {response.status_code} so assuming that autonomous fetching is not allowed, the user can try manually fetching by using the fetch prompt",
+            ),
+        )
+    if 400 <= response.status_code < 500:
+        return
+    robot_txt = response.text
+
+    from protego import Protego
+
+    # Protego 自身会忽略 # 注释，无需逐行预处理
+    robot_parser = Protego.parse(robot_txt)
     if not robot_parser.can_fetch(str(url), user_agent):
         raise McpError(
             ErrorData(
@@ -160,66 +239,107 @@ async def check_may_autonomously_fetch_url(url: str, user_agent: str) -> None:
         )
 
 
+def _decode_body(body: bytes, encoding: str | None, truncated: bool) -> str:
+    """Decode a response body, tolerating a multi-byte character cut off at the end."""
+    if encoding == "utf-8":
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        return decoder.decode(body, final=not truncated)
+
+    # 确保内容是 UTF-8 编码，避免 Windows 上的编码问题
+    # 如果 UTF-8 解码失败，尝试其他常见编码
+    for candidate in ["utf-8", "gbk", "gb2312", "iso-8859-1"]:
+        try:
+            decoder = codecs.getincrementaldecoder(candidate)()
+            return decoder.decode(body, final=not truncated)
+        except UnicodeDecodeError:
+            continue
+    # 如果所有编码都失败，使用错误替换
+    return body.decode("utf-8", errors="replace")
+
+
+def _is_html(head: bytes, content_type: str) -> bool:
+    """Sniff whether a response is an HTML page from its first bytes and content type."""
+    head = head[:HTML_SNIFF_BYTES].lower()
+    return (
+        b"<html" in head
+        or b"<!doctype html" in head
+        or "text/html" in content_type
+        or not content_type
+    )
+
+
 async def fetch_url(
     url: str,
     user_agent: str,
     force_raw: bool = False,
-) -> tuple[str, str]:
+    max_chars: int | None = None,
+) -> tuple[str, str, bool]:
     """
     Fetch the URL and return the content in a form ready for the LLM, as well as a prefix string with status information.
+
+    The body is streamed and reading stops after MAX_RESPONSE_BYTES, so very large
+    pages are never fully buffered or decoded. When the content is returned raw,
+    max_chars (the end of the caller's window) tightens that limit to what the
+    window can need. The third element is True when the body was cut off at
+    MAX_RESPONSE_BYTES.
     """
 
-    async with httpx.AsyncClient(
-        limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
-    ) as client:
-        try:
-            response = await client.get(
-                url,
-                follow_redirects=True,
-                headers={"User-Agent": user_agent},
-                timeout=30,
-            )
-        except httpx.HTTPError as e:
-            raise McpError(
-                ErrorData(code=INTERNAL_ERROR, message=f"Failed to fetch {url}: {e!r}"),
-            )
-        if response.status_code >= 400:
-            raise McpError(
-                ErrorData(
-                    code=INTERNAL_ERROR,
-                    message=f"Failed to fetch {url} - status code {response.status_code}",
-                ),
-            )
-
-        page_raw = response.text
+    window_limit = None
+    if max_chars is not None:
+        # UTF-8 每个字符最多 4 字节；多读一个字符用于判断是否还有剩余内容
+        window_limit = min(MAX_RESPONSE_BYTES, (max_chars + 1) * 4)
 
-    # 确保内容是 UTF-8 编码，避免 Windows 上的编码问题
-    if response.encoding != "utf-8":
-        try:
-            page_raw = response.content.decode("utf-8")
-        except UnicodeDecodeError:
-            # 如果 UTF-8 解码失败，尝试其他常见编码
-            for encoding in ["gbk", "gb2312", "iso-8859-1"]:
-                try:
-                    page_raw = response.content.decode(encoding)
+    client = _get_client()
+    body = bytearray()
+    byte_limit = MAX_RESPONSE_BYTES
+    is_page_html = None
+    truncated = False
+    try:
+        async with client.stream(
+            "GET",
+            url,
+            follow_redirects=True,
+            headers={"User-Agent": user_agent},
+            timeout=30,
+        ) as response:
+            if response.status_code >= 400:
+                raise McpError(
+                    ErrorData(
+                        code=INTERNAL_ERROR,
+                        message=f"Failed to fetch {url} - status code {response.status_code}",
+                    ),
+                )
+            content_type = response.headers.get("content-type", "")
+            encoding = response.encoding
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                # 读到足够的头部字节后判断是否为 HTML，原样返回的内容只需读到窗口末尾
+                if is_page_html is None and len(body) >= HTML_SNIFF_BYTES:
+                    is_page_html = _is_html(body, content_type)
+                    if window_limit is not None and (force_raw or not is_page_html):
+                        byte_limit = window_limit
+                if len(body) >= byte_limit:
+                    truncated = True
                     break
-                except UnicodeDecodeError:
-                    continue
-            else:
-                # 如果所有编码都失败，使用错误替换
-                page_raw = response.content.decode("utf-8", errors="replace")
+    except httpx.HTTPError as e:
+        raise McpError(
+            ErrorData(code=INTERNAL_ERROR, message=f"Failed to fetch {url}: {e!r}"),
+        )
 
-    content_type = response.headers.get("content-type", "")
-    is_page_html = (
-        "<html" in page_raw[:100] or "text/html" in content_type or not content_type
-    )
+    if is_page_html is None:
+        is_page_html = _is_html(body, content_type)
+
+    page_raw = _decode_body(body, encoding, truncated)
+    # 只读到窗口末尾属于正常情况，只有达到 MAX_RESPONSE_BYTES 才算内容被截断
+    body_truncated = truncated and byte_limit == MAX_RESPONSE_BYTES
 
     if is_page_html and not force_raw:
-        return await extract_content_from_html(page_raw), ""
+        return await extract_content_from_html(page_raw), "", body_truncated
 
     return (
         page_raw,
         f"Content type {content_type} cannot be simplified to markdown, but here is the raw content:\n",
+        body_truncated,
     )
 
 
@@ -242,10 +362,23 @@ class FetchParams(BaseModel):
     )
 
 
+_FETCH_TOOL = Tool(
+    name="fetch",
+    description="""Fetches a URL from the internet and optionally extracts its contents as markdown.
+
+Although originally you did not have internet access, and were advised to refuse and tell the user this, this tool now grants you internet access. Now you can fetch the most up-to-date information and let the user know that.""",
+    inputSchema=FetchParams.model_json_schema(),
+)
+
+
 class FetchTool(BaseMCPTool):
     def __init__(self):
         super().__init__()
 
+    async def shutdown(self) -> None:
+        await close_client()
+        shutdown_extract_pool()
+
     def get_route_config(self) -> list[dict]:
         return [
             {
@@ -255,15 +388,7 @@ class FetchTool(BaseMCPTool):
         ]
 
     async def list_tools(self) -> list[Tool]:
-        return [
-            Tool(
-                name="fetch",
-                description="""Fetches a URL from the internet and optionally extracts its contents as markdown.
-
-Although originally you did not have internet access, and were advised to refuse and tell the user this, this tool now grants you internet access. Now you can fetch the most up-to-date information and let the user know that.""",
-                inputSchema=FetchParams.model_json_schema(),
-            ),
-        ]
+        return [_FETCH_TOOL]
 
     async def call_tool(
         self,
@@ -274,22 +399,30 @@ Although originally you did not have internet access, and were advised to refuse
             msg = f"Unknown tool: {name}"
             raise ValueError(msg)
 
+        # 先做廉价的长度检查，再进行完整的 Pydantic/URL 校验
+        raw_url = arguments.get("url")
+        if not raw_url:
+            raise McpError(ErrorData(code=INVALID_PARAMS, message="URL is required"))
+        if len(str(raw_url)) > 2048:  # Common URL length limit
+            raise McpError(ErrorData(code=INVALID_PARAMS, message="URL too long"))
+
         try:
             args = FetchParams(**arguments)
         except ValueError as e:
             raise McpError(ErrorData(code=INVALID_PARAMS, message=str(e)))
 
         url = str(args.url)
-        if not url:
-            raise McpError(ErrorData(code=INVALID_PARAMS, message="URL is required"))
-        if len(url) > 2048:  # Common URL length limit
+        if len(url) > 2048:  # 规范化（如 IDNA 编码）后可能变长
             raise McpError(ErrorData(code=INVALID_PARAMS, message="URL too long"))
 
-        content, prefix = await fetch_url(
+        content, prefix, body_truncated = await fetch_url(
             url,
             DEFAULT_USER_AGENT_AUTONOMOUS,
             force_raw=args.raw,
+            max_chars=args.start_index + args.max_length,
         )
+        if body_truncated:
+            prefix += f"Response body exceeded {MAX_RESPONSE_BYTES} bytes; content after that point was not downloaded.\n"
         original_length = len(content)
         if args.start_index >= original_length:
             content = "<error>No more content available.</error>"
@@ -26,6 +26,14 @@ class FlowWaitParams(BaseModel):
     )
 
 
+# Tool 定义是常量，导入时构建一次，避免每次 list_tools 重新生成 JSON Schema
+_FLOW_WAIT_TOOL = Tool(
+    name="flow_wait",
+    description="Wait for a specified number of seconds. Useful for implementing delays in workflows or waiting between operations.",
+    inputSchema=FlowWaitParams.model_json_schema(),
+)
+
+
 class FlowWaitTool(BaseMCPTool):
     """Tool for waiting a specified number of seconds."""
 
@@ -43,13 +51,7 @@ class FlowWaitTool(BaseMCPTool):
 
     async def list_tools(self) -> list[Tool]:
         """List the tools provided by this module."""
-        return [
-            Tool(
-                name="flow_wait",
-                description="Wait for a specified number of seconds. Useful for implementing delays in workflows or waiting between operations.",
-                inputSchema=FlowWaitParams.model_json_schema(),
-            ),
-        ]
+        return [_FLOW_WAIT_TOOL]
 
     async def call_tool(
         self,
@@ -2,12 +2,16 @@
 Image upload tool for Automata MCP Server
 """
 
+import asyncio
+import os
 import uuid
+from functools import lru_cache
 from pathlib import Path
 from typing import Sequence
 
 from fastapi import APIRouter, HTTPException, UploadFile
 from fastapi.responses import JSONResponse
+from loguru import logger
 from mcp.types import EmbeddedResource, ImageContent, TextContent, Tool
 from pydantic import BaseModel
 
@@ -15,12 +19,59 @@ from ...base_tool import BaseMCPTool
 from ...exceptions import handle_exception
 
 
+# 上传文件时每次读取的块大小，以及写入磁盘前在用户态累积的缓冲区大小
+UPLOAD_CHUNK_SIZE = 64 * 1024
+UPLOAD_WRITE_BUFFER = 1024 * 1024
+
+# 同时写入磁盘的上传文件数上限，以及等待空闲名额的超时时间（秒）
+DEFAULT_UPLOAD_CONCURRENCY_LIMIT = 10
+UPLOAD_ACQUIRE_TIMEOUT = 30
+
+
+def _parse_concurrency_limit() -> int:
+    """读取 UPLOAD_CONCURRENCY_LIMIT，非法值记录警告并使用默认值"""
+    raw = os.getenv("UPLOAD_CONCURRENCY_LIMIT", str(DEFAULT_UPLOAD_CONCURRENCY_LIMIT))
+    try:
+        limit = int(raw)
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        logger.warning(
+            f"Invalid UPLOAD_CONCURRENCY_LIMIT={raw!r}, "
+            f"falling back to {DEFAULT_UPLOAD_CONCURRENCY_LIMIT}",
+        )
+        return DEFAULT_UPLOAD_CONCURRENCY_LIMIT
+    return limit
+
+
+UPLOAD_CONCURRENCY_LIMIT = _parse_concurrency_limit()
+
+# 单次多图上传请求内并行处理的文件数
+UPLOAD_PER_REQUEST_CONCURRENCY = 4
+
+_upload_semaphore = asyncio.BoundedSemaphore(UPLOAD_CONCURRENCY_LIMIT)
+
+# 允许上传的图片扩展名及单个文件大小上限
+_ALLOWED_EXT: frozenset[str] = frozenset(
+    {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp"},
+)
+_ALLOWED_EXT_MSG = ", ".join(sorted(_ALLOWED_EXT))
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB
+
+
 class ImageUploadParams(BaseModel):
     """Parameters for image upload operations."""
 
     file: UploadFile
 
 
+_IMAGE_UPLOAD_TOOL = Tool(
+    name="image_upload",
+    description="Upload and manage image files. Supports single/multiple uploads, deletion, and listing.",
+    inputSchema=ImageUploadParams.model_json_schema(),
+)
+
+
 class ImageUploadTool(BaseMCPTool):
     """Tool for handling image uploads and management."""
 
@@ -35,22 +86,12 @@ class ImageUploadTool(BaseMCPTool):
     async def _upload_single_image(self, file: UploadFile) -> dict:
         """Upload a single image file and return result info."""
         # Validate file type
-        allowed_extensions = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp"}
         file_extension = Path(file.filename).suffix.lower()
 
-        if file_extension not in allowed_extensions:
+        if file_extension not in _ALLOWED_EXT:
             raise HTTPException(
                 status_code=400,
-                detail=f"File type not allowed. Allowed types: {', '.join(allowed_extensions)}",
-            )
-
-        # Validate file size (max 10MB)
-        max_size = 10 * 1024 * 1024  # 10MB
-        file_content = await file.read()
-        if len(file_content) > max_size:
-            raise HTTPException(
-                status_code=400,
-                detail="File too large. Maximum size: 10MB",
+                detail=f"File type not allowed. Allowed types: {_ALLOWED_EXT_MSG}",
             )
 
         # Generate unique filename
@@ -58,17 +99,72 @@ class ImageUploadTool(BaseMCPTool):
         uploads_dir = get_uploads_dir()
         file_path = uploads_dir / unique_filename
 
-        # Save file
-        with open(file_path, "wb") as buffer:
-            buffer.write(file_content)
+        # Save file, validating size (max 10MB) while streaming
+        size = await self._save_upload_file(file, file_path, MAX_UPLOAD_SIZE)
+        if size is None:
+            raise HTTPException(
+                status_code=400,
+                detail="File too large. Maximum size: 10MB",
+            )
 
         return {
             "filename": unique_filename,
             "original_filename": file.filename,
             "url": f"/static/upload_images/{unique_filename}",
-            "size": len(file_content),
+            "size": size,
         }
 
+    async def _save_upload_file(
+        self,
+        file: UploadFile,
+        file_path: Path,
+        max_size: int,
+    ) -> int | None:
+        """Stream an uploaded file to disk in chunks.
+
+        At most UPLOAD_CONCURRENCY_LIMIT files are written at once across all
+        requests; raises HTTPException(503) if no slot frees up in time.
+
+        Returns:
+            Number of bytes written, or None if the file exceeded max_size
+            (the partial file is removed).
+        """
+        try:
+            await asyncio.wait_for(
+                _upload_semaphore.acquire(),
+                timeout=UPLOAD_ACQUIRE_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many concurrent uploads, please retry later",
+            )
+
+        total = 0
+        try:
+            # 文件打开、写入和关闭都放到线程中执行，避免阻塞事件循环
+            buffer = await asyncio.to_thread(
+                open, file_path, "wb", buffering=UPLOAD_WRITE_BUFFER
+            )
+            try:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    total += len(chunk)
+                    if total > max_size:
+                        break
+                    await asyncio.to_thread(buffer.write, chunk)
+            finally:
+                await asyncio.to_thread(buffer.close)
+        except BaseException:
+            await asyncio.to_thread(file_path.unlink, missing_ok=True)
+            raise
+        finally:
+            _upload_semaphore.release()
+
+        if total > max_size:
+            await asyncio.to_thread(file_path.unlink, missing_ok=True)
+            return None
+        return total
+
     def _setup_routes(self):
         """Setup the REST API routes for image upload."""
 
@@ -127,73 +223,33 @@ class ImageUploadTool(BaseMCPTool):
             Returns:
                 JSON response with upload results
             """
-            try:
-                results = []
-                errors = []
+            sem = asyncio.Semaphore(UPLOAD_PER_REQUEST_CONCURRENCY)
 
-                for i, file in enumerate(files):
+            async def _process_one(i: int, file: UploadFile) -> dict:
+                async with sem:
                     try:
-                        # Validate file type
-                        allowed_extensions = {
-                            ".jpg",
-                            ".jpeg",
-                            ".png",
-                            ".gif",
-                            ".bmp",
-                            ".webp",
+                        result = await self._upload_single_image(file)
+                    except HTTPException as he:
+                        return {
+                            "index": i,
+                            "filename": file.filename,
+                            "error": he.detail,
                         }
-                        file_extension = Path(file.filename).suffix.lower()
-
-                        if file_extension not in allowed_extensions:
-                            errors.append(
-                                {
-                                    "index": i,
-                                    "filename": file.filename,
-                                    "error": f"File type not allowed. Allowed types: {', '.join(allowed_extensions)}",
-                                },
-                            )
-                            continue
-
-                        # Validate file size (max 10MB per file)
-                        max_size = 10 * 1024 * 1024  # 10MB
-                        file_content = await file.read()
-                        if len(file_content) > max_size:
-                            errors.append(
-                                {
-                                    "index": i,
-                                    "filename": file.filename,
-                                    "error": "File too large. Maximum size: 10MB",
-                                },
-                            )
-                            continue
-
-                        # Generate unique filename
-                        unique_filename = f"{uuid.uuid4()}{file_extension}"
-                        uploads_dir = get_uploads_dir()
-                        file_path = uploads_dir / unique_filename
-
-                        # Save file
-                        with open(file_path, "wb") as buffer:
-                            buffer.write(file_content)
-
-                        results.append(
-                            {
-                                "index": i,
-                                "filename": unique_filename,
-                                "original_filename": file.filename,
-                                "url": f"/static/upload_images/{unique_filename}",
-                                "size": len(file_content),
-                            },
-                        )
-
                     except Exception as e:
-                        errors.append(
-                            {
-                                "index": i,
-                                "filename": file.filename,
-                                "error": str(e),
-                            },
-                        )
+                        return {
+                            "index": i,
+                            "filename": file.filename,
+                            "error": str(e),
+                        }
+                    return {"index": i, **result}
+
+            try:
+                # gather 保持输入顺序，按是否含 error 拆分结果
+                outcomes = await asyncio.gather(
+                    *(_process_one(i, file) for i, file in enumerate(files)),
+                )
+                results = [o for o in outcomes if "error" not in o]
+                errors = [o for o in outcomes if "error" in o]
 
                 # 生成所有图片URL的分号分隔字符串
                 all_pic = ";".join([result["url"] for result in results])
@@ -231,12 +287,12 @@ class ImageUploadTool(BaseMCPTool):
             uploads_dir = get_uploads_dir()
             file_path = uploads_dir / filename
 
-            if not file_path.exists():
+            if not await asyncio.to_thread(file_path.exists):
                 raise HTTPException(status_code=404, detail="File not found")
 
             try:
                 # Delete file
-                file_path.unlink()
+                await asyncio.to_thread(file_path.unlink)
 
                 return JSONResponse(
                     content={
@@ -261,21 +317,7 @@ class ImageUploadTool(BaseMCPTool):
             """
             try:
                 uploads_dir = get_uploads_dir()
-                images = []
-
-                if uploads_dir.exists():
-                    for file_path in uploads_dir.iterdir():
-                        if file_path.is_file():
-                            stat = file_path.stat()
-                            images.append(
-                                {
-                                    "filename": file_path.name,
-                                    "url": f"/static/upload_images/{file_path.name}",
-                                    "size": stat.st_size,
-                                    "created": stat.st_ctime,
-                                    "modified": stat.st_mtime,
-                                },
-                            )
+                images = await asyncio.to_thread(_list_image_files, uploads_dir)
 
                 return JSONResponse(
                     content={
@@ -293,13 +335,7 @@ class ImageUploadTool(BaseMCPTool):
 
     async def list_tools(self) -> list[Tool]:
         """List the tools provided by this module."""
-        return [
-            Tool(
-                name="image_upload",
-                description="Upload and manage image files. Supports single/multiple uploads, deletion, and listing.",
-                inputSchema=ImageUploadParams.model_json_schema(),
-            ),
-        ]
+        return [_IMAGE_UPLOAD_TOOL]
 
     async def call_tool(
         self,
@@ -347,13 +383,36 @@ class ImageUploadTool(BaseMCPTool):
         return self.router
 
 
+def _list_image_files(uploads_dir: Path) -> list[dict]:
+    """Collect info for every file in the uploads directory (blocking)."""
+    images = []
+    if uploads_dir.exists():
+        # scandir 在遍历时即带回文件类型，避免对每个条目额外 stat
+        with os.scandir(uploads_dir) as it:
+            for entry in it:
+                if entry.is_file():
+                    stat = entry.stat()
+                    images.append(
+                        {
+                            "filename": entry.name,
+                            "url": f"/static/upload_images/{entry.name}",
+                            "size": stat.st_size,
+                            "created": stat.st_ctime,
+                            "modified": stat.st_mtime,
+                        },
+                    )
+    return images
+
+
+@lru_cache(maxsize=1)
 def get_static_dir() -> Path:
     """Get the static directory path"""
     return Path(__file__).parent.parent.parent.parent / "data" / "static"
 
 
+@lru_cache(maxsize=1)
 def get_uploads_dir() -> Path:
-    """Get the uploads directory path"""
+    """Get the uploads directory path, creating it on first use"""
     static_dir = get_static_dir()
     uploads_dir = static_dir / "upload_images"
     uploads_dir.mkdir(exist_ok=True)
@@ -21,6 +21,13 @@ class VideoUploadParams(BaseModel):
     file: UploadFile
 
 
+_VIDEO_UPLOAD_TOOL = Tool(
+    name="video_upload",
+    description="Upload and manage video files. Supports single/multiple uploads, deletion, and listing.",
+    inputSchema=VideoUploadParams.model_json_schema(),
+)
+
+
 class VideoUploadTool(BaseMCPTool):
     """Tool for handling video uploads and management."""
 
@@ -302,13 +309,7 @@ class VideoUploadTool(BaseMCPTool):
 
     async def list_tools(self) -> list[Tool]:
         """List the tools provided by this module."""
-        return [
-            Tool(
-                name="video_upload",
-                description="Upload and manage video files. Supports single/multiple uploads, deletion, and listing.",
-                inputSchema=VideoUploadParams.model_json_schema(),
-            ),
-        ]
+        return [_VIDEO_UPLOAD_TOOL]
 
     async def call_tool(
         self,